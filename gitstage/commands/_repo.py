@@ -0,0 +1,17 @@
+import os
+from functools import lru_cache
+from typing import Set
+
+from git import GitCmdObjectDB, Repo
+
+@lru_cache(maxsize=1)
+def _open_repo(cwd: str) -> Repo:
+    return Repo(cwd, search_parent_directories=True, odbt=GitCmdObjectDB)
+
+def get_repo() -> Repo:
+    """Get the Repo for the current directory, opened once and reused while the directory is unchanged."""
+    return _open_repo(os.getcwd())
+
+def all_refs(repo: Repo) -> Set[str]:
+    """Get every full ref name (refs/heads/dev, refs/remotes/origin/dev, ...) from a single for-each-ref."""
+    return set(repo.git.for_each_ref("--format=%(refname)").splitlines())
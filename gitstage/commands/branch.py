@@ -71,10 +71,7 @@ def main(
     """List all branches or switch to a specific branch."""
     try:
         # Verify Git repository
-        require_git_repo()
-        
-        # Get the current repository
-        repo = Repo(".")
+        repo = require_git_repo()
         
         if branch_name:
             # Switch to specified branch
@@ -44,10 +44,7 @@ def main(
     """Reset a branch to match its source branch, removing any extra commits."""
     try:
         # Verify Git repository
-        require_git_repo()
-        
-        # Get the current repository
-        repo = Repo(".")
+        repo = require_git_repo()
         
         # Determine destination and source branches
         if not branch_to:
@@ -20,6 +20,9 @@ from rich.syntax import Syntax
 
 console = Console()
 
+_IS_WINDOWS = platform.system() == "Windows"
+_CR_HEADER = re.compile(r"### CR-(\d+): (.*)")
+
 @lru_cache(maxsize=1)
 def load_stageflow_config() -> Dict[str, Dict[str, bool]]:
     """Load and cache the stageflow configuration from JSON."""
@@ -47,12 +50,12 @@ def is_stage_editable(stage: str) -> bool:
 def get_next_cr_number() -> str:
     """Get the next CR number from .gitstage/next_cr.txt."""
     cr_file = Path(".gitstage/next_cr.txt")
-    if not cr_file.exists():
+    try:
+        return cr_file.read_text().strip()
+    except FileNotFoundError:
         cr_file.parent.mkdir(parents=True, exist_ok=True)
         cr_file.write_text("0001")
         return "0001"
-    
-    return cr_file.read_text().strip()
 
 def normalize_cr_id(input_id: str) -> str:
     """Normalize CR ID to standard format (CR-XXXX)."""
@@ -135,7 +138,10 @@ def parse_cr_metadata(content: str) -> dict:
         "author": ""
     }
     
-    header_match = re.match(r"### CR-(\d+): (.*)", content.split("\n")[0])
+    # Only the first line can hold the header; avoid splitting the whole file for it
+    nl = content.find("\n")
+    first_line = content if nl < 0 else content[:nl]
+    header_match = _CR_HEADER.match(first_line)
     if header_match:
         metadata["number"] = header_match.group(1)
         metadata["summary"] = header_match.group(2)
@@ -152,9 +158,10 @@ def parse_cr_metadata(content: str) -> dict:
     
     return metadata
 
+@lru_cache(maxsize=1)
 def detect_notepad_plus_plus() -> Optional[str]:
-    """Auto-detect Notepad++ installation on Windows."""
-    if platform.system() != "Windows":
+    """Auto-detect Notepad++ installation on Windows (cached for the process)."""
+    if not _IS_WINDOWS:
         return None
         
     known_paths = [
@@ -177,7 +184,7 @@ def open_editor(file_path: str, editor_override: Optional[str] = None) -> bool:
             editor = detect_notepad_plus_plus()
             
             if not editor:
-                if platform.system() == "Windows":
+                if _IS_WINDOWS:
                     editor = "notepad"
                 else:
                     for ed in ["nano", "vim", "vi"]:
@@ -187,7 +194,7 @@ def open_editor(file_path: str, editor_override: Optional[str] = None) -> bool:
                     if not editor:
                         raise RuntimeError("No suitable editor found. Please set EDITOR environment variable.")
         
-        if platform.system() == "Windows":
+        if _IS_WINDOWS:
             if editor.startswith('"') and '"' in editor[1:]:
                 path_end = editor.find('"', 1)
                 editor_path = editor[1:path_end]
@@ -325,7 +332,7 @@ def create_cr_file(
     cr_dir = Path(".gitstage/change_requests")
     cr_dir.mkdir(parents=True, exist_ok=True)
     cr_file = cr_dir / f"CR-{cr_number}.md"
-    cr_file.write_text(content, encoding='utf-8')
+    cr_file.write_bytes(content.encode("utf-8"))
     return cr_file
 
 def show_diff_preview(original: str, edited: str) -> None:
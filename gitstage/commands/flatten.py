@@ -102,10 +102,7 @@ def main(
     """Reset a branch to match its source branch, removing any extra commits."""
     try:
         # Verify Git repository
-        require_git_repo()
-        
-        # Get the current repository
-        repo = Repo(".")
+        repo = require_git_repo()
         
         # Get stageflow
         stages = get_stageflow()
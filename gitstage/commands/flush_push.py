@@ -0,0 +1,40 @@
+import typer
+from git import GitCommandError
+from rich.console import Console
+from rich.panel import Panel
+
+from gitstage.commands.push import load_deferred_pushes, save_deferred_pushes, record_synced
+from gitstage.commands.utils import require_git_repo
+
+console = Console()
+
+def main():
+    """Push every promotion queued with `gitstage push --defer` in one atomic push."""
+    repo = require_git_repo()
+
+    entries = load_deferred_pushes()
+    mine = [e for e in entries if e["repo"] == repo.working_dir]
+    if not mine:
+        console.print("[green]✓ No deferred pushes for this repository.[/green]")
+        raise typer.Exit(0)
+
+    # Pushing a branch sends its latest commit, which covers every queued promotion to it
+    branches = list(dict.fromkeys(e["branch"] for e in mine))
+    refspecs = [f"refs/heads/{b}:refs/heads/{b}" for b in branches]
+
+    console.print(f"[yellow]Pushing {', '.join(branches)} to origin...[/yellow]")
+    try:
+        repo.git.push("--atomic", "origin", *refspecs)
+    except GitCommandError as e:
+        console.print(f"[red]❌ Push failed, nothing was updated: {e.stderr.strip() or e}[/red]")
+        raise typer.Exit(1)
+
+    for branch in branches:
+        record_synced(repo, branch)
+    save_deferred_pushes([e for e in entries if e["repo"] != repo.working_dir])
+
+    console.print(Panel(
+        f"Pushed {len(mine)} deferred promotion(s) to: {', '.join(branches)}",
+        title="🎉 Success",
+        border_style="green"
+    ))
@@ -1,161 +1,226 @@
 import typer
-from git import Repo, InvalidGitRepositoryError
+from git import GitCommandError, Repo, InvalidGitRepositoryError
 from rich.console import Console
 from rich.panel import Panel
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import json
+from typing import Optional
+import hashlib
 import re
+import threading
 
-from gitstage.commands.utils import save_stageflow
+from gitstage.commands._repo import all_refs, get_repo
+from gitstage.commands.utils import git_with_input, save_stageflow, split_nul, stageflow_json
 
 app = typer.Typer()
 console = Console()
 
-def ensure_branch_published(repo: Repo, branch: str):
-    """Ensure a branch exists and is published to the remote."""
+_STAGE_RE = re.compile(r"[A-Za-z0-9._/-]+")
+
+# Plumbing calls are safe to run per branch in parallel; anything touching the index is not
+_worktree_lock = threading.Lock()
+
+def validate_stage_name(stage: str):
+    """Raise BadParameter if a stage name cannot be used as a branch name."""
+    if not stage or stage.isspace():
+        raise typer.BadParameter(f"Invalid stage name '{stage}': must not be empty or whitespace.")
+    if stage[0] == "-":
+        raise typer.BadParameter(f"Invalid stage name '{stage}': must not start with a dash.")
+    if not _STAGE_RE.fullmatch(stage):
+        raise typer.BadParameter(f"Invalid stage name '{stage}': must only contain letters, numbers, dots, underscores, dashes, or slashes.")
+
+def ensure_branch_published(branch: str, refs: set[str]) -> bool:
+    """Check whether a branch is published to the remote.
+    Returns True if the branch still needs to be pushed; the push itself is batched in main."""
+    if f"refs/remotes/origin/{branch}" in refs:
+        console.print(f"[yellow]ℹ Branch '{branch}' is already published[/yellow]")
+        return False
+    
+    console.print(f"[green]✔ Branch '{branch}' will be published to remote origin[/green]")
+    return True
+
+def push_branches(repo: Repo, branches: list[str]):
+    """Push all given branches to origin in a single atomic push."""
     try:
-        # Check if branch exists on remote
-        remote_ref = f"origin/{branch}"
-        if remote_ref in repo.references:
-            console.print(f"[yellow]ℹ Branch '{branch}' is already published[/yellow]")
-            return
-        
-        # Push branch to remote
-        repo.git.push("--set-upstream", "origin", branch)
-        console.print(f"[green]✔ Published branch '{branch}' to remote origin[/green]")
+        refspecs = [f"refs/heads/{branch}:refs/heads/{branch}" for branch in branches]
+        repo.git.push("--atomic", "--set-upstream", "origin", *refspecs)
+        console.print(f"[green]✓ Pushed {', '.join(branches)} to origin[/green]")
     except Exception as e:
-        console.print(f"[red]❌ Failed to publish branch '{branch}': {str(e)}[/red]")
+        console.print(f"[red]❌ Failed to push branches: {str(e)}[/red]")
         raise
 
-def commit_and_push_config(repo: Repo, branch: str, stages: list[str]):
-    """Commit and push the config file to a specific branch."""
+def _object_at(repo: Repo, rev: str, path: str) -> Optional[str]:
+    """Return the object id at path in rev, or None if it does not exist."""
+    try:
+        return repo.git.rev_parse("--verify", "-q", f"{rev}:{path}")
+    except GitCommandError:
+        return None
+
+def _staged_blob(repo: Repo, path: str) -> Optional[str]:
+    """Object id of path in the index, or None if it is not staged."""
+    staged = repo.git.ls_files("-s", "--", path)
+    return staged.split()[1] if staged else None
+
+def _worktree_blob(repo: Repo, path: str) -> Optional[str]:
+    """Object id the working tree file at path would have, or None if it does not exist."""
+    if not (Path(repo.working_dir) / path).exists():
+        return None
+    return repo.git.hash_object("--", path)
+
+def tree_with_entry(repo: Repo, base: Optional[str], mode: str, obj_type: str, sha: str, name: str) -> str:
+    """Write a tree equal to base (a tree-ish, or None for an empty tree) with entry `name` set to the given object."""
+    entries = []
+    if base:
+        entries = [entry for entry in split_nul(repo.git.ls_tree("-z", base)) if entry.split("\t", 1)[1] != name]
+    entries.append(f"{mode} {obj_type} {sha}\t{name}")
+    return git_with_input(repo, "mktree", "-z", data="".join(f"{entry}\0" for entry in entries).encode("utf-8"))
+
+def commit_file_to_branch(repo: Repo, branch: str, path: str, content: str, message: str) -> bool:
+    """Commit a top-level file to a branch using git plumbing, without checking it out.
+    Returns True if a commit was made, False if the branch already has this content."""
+    parent = repo.git.rev_parse(f"refs/heads/{branch}")
+    data = content.encode("utf-8")
+    
+    # Nothing to write if the branch already holds this exact blob
+    blob_sha = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+    old_blob = _object_at(repo, parent, path)
+    if old_blob == blob_sha:
+        return False
+    
+    # Write the blob and swap it into the branch's root tree
+    blob = git_with_input(repo, "hash-object", "-w", "--stdin", data=data)
+    tree = tree_with_entry(repo, parent, "100644", "blob", blob, path)
+    if tree == repo.git.rev_parse(f"{parent}^{{tree}}"):
+        return False
+    
+    # Commit on top of the branch and move the ref (fails if the branch moved meanwhile)
+    commit = repo.git.commit_tree(tree, "-p", parent, "-m", message)
+    repo.git.update_ref(f"refs/heads/{branch}", commit, parent)
+    
+    # Keep the index and working tree in step when the branch is checked out,
+    # unless the user has local edits to the file
+    with _worktree_lock:
+        if not repo.head.is_detached and repo.active_branch.name == branch:
+            worktree_blob = _worktree_blob(repo, path)
+            if worktree_blob == blob:
+                # The file already holds the committed content (e.g. the config main just wrote); sync the index only
+                repo.git.reset("-q", "--", path)
+            elif worktree_blob == old_blob and _staged_blob(repo, path) == old_blob:
+                repo.git.checkout(branch, "--", path)
+            else:
+                console.print(f"[yellow]⚠ {path} has local changes on {branch}; left it as is. "
+                              f"The committed version is in {branch}:{path}[/yellow]")
+    return True
+
+def commit_and_push_config(repo: Repo, branch: str, stages: list[str]) -> bool:
+    """Commit the config file to a specific branch.
+    Returns True if a commit was made; the push is batched in main."""
     try:
-        # Switch to the branch
-        repo.git.checkout(branch)
-        
-        # Ensure config file exists in working directory
-        config_path = Path(".gitstage_config.json")
-        if not config_path.exists():
-            # Save the config file again
-            save_stageflow(stages)
-            console.print(f"[yellow]ℹ Recreated config file on {branch}[/yellow]")
-        
-        # Add the config file
-        repo.index.add([".gitstage_config.json"])
-        
-        # Check if there are changes to commit
-        if repo.is_dirty():
-            # Commit the changes
-            repo.index.commit("chore: update .gitstage_config.json")
+        if commit_file_to_branch(
+            repo, branch, ".gitstage_config.json", stageflow_json(stages),
+            "chore: update .gitstage_config.json"
+        ):
             console.print(f"[green]✓ Committed config file to {branch}[/green]")
-            
-            # Push to remote
-            repo.git.push("origin", branch)
-            console.print(f"[green]✓ Pushed config file to {branch}[/green]")
-        else:
-            console.print(f"[yellow]ℹ No config changes to commit on {branch}[/yellow]")
+            return True
+        
+        console.print(f"[yellow]ℹ No config changes to commit on {branch}[/yellow]")
+        return False
             
     except Exception as e:
-        console.print(f"[red]❌ Failed to commit/push config to {branch}: {str(e)}[/red]")
+        console.print(f"[red]❌ Failed to commit config to {branch}: {str(e)}[/red]")
         raise
 
-def setup_gitignore(repo: Repo, branch: str):
-    """Set up .gitignore to ignore .gitstage/* except config file."""
+def setup_gitignore(repo: Repo, branch: str) -> bool:
+    """Set up .gitignore to ignore .gitstage/* except config file.
+    Returns True if a commit was made; the push is batched in main."""
     try:
-        # Switch to the branch
-        repo.git.checkout(branch)
-        
-        # Create or update .gitignore
-        gitignore_path = Path(".gitignore")
         gitignore_content = """# GitStage
 .gitstage/*
 !.gitstage_config.json
 """
         
-        # Read existing content if file exists
-        existing_content = ""
-        if gitignore_path.exists():
-            existing_content = gitignore_path.read_text()
+        # Read the branch's .gitignore if it has one
+        try:
+            existing_content = repo.git.show(f"{branch}:.gitignore", strip_newline_in_stdout=False)
+        except GitCommandError:
+            existing_content = ""
         
         # Add GitStage rules if not present
         if "# GitStage" not in existing_content:
             if existing_content and not existing_content.endswith("\n"):
                 existing_content += "\n"
             existing_content += gitignore_content
-            gitignore_path.write_text(existing_content)
-            
-            # Stage and commit .gitignore
-            repo.index.add([".gitignore"])
-            repo.index.commit("chore: add GitStage rules to .gitignore")
             
-            # Push if remote exists
-            if "origin" in repo.remotes:
-                repo.git.push("origin", branch)
+            # Commit .gitignore straight to the branch
+            commit_file_to_branch(
+                repo, branch, ".gitignore", existing_content,
+                "chore: add GitStage rules to .gitignore"
+            )
             
             console.print(f"[green]✓ Added GitStage rules to .gitignore on {branch}[/green]")
-        else:
-            console.print(f"[yellow]ℹ GitStage rules already in .gitignore on {branch}[/yellow]")
+            return True
+        
+        console.print(f"[yellow]ℹ GitStage rules already in .gitignore on {branch}[/yellow]")
+        return False
             
     except Exception as e:
         console.print(f"[red]❌ Failed to set up .gitignore on {branch}: {str(e)}[/red]")
         raise
 
-def setup_cr_infrastructure(repo: Repo):
-    """Set up the CR infrastructure in the gitstage/cr-log branch."""
+def prepare_stage(repo: Repo, stage: str, stages: list[str], refs: set[str]) -> bool:
+    """Commit the GitStage files to a stage branch.
+    Returns True if the branch needs to be pushed."""
+    needs_push = ensure_branch_published(stage, refs)
+    gitignore_committed = setup_gitignore(repo, stage)
+    config_committed = commit_and_push_config(repo, stage, stages)
+    return needs_push or gitignore_committed or config_committed
+
+def setup_cr_infrastructure(repo: Repo, heads: set[str]) -> bool:
+    """Set up the CR infrastructure in the gitstage/cr-log branch using git plumbing, without checking it out.
+    Returns True if a commit was made; the push is batched in main."""
+    branch = "gitstage/cr-log"
     try:
-        # Save current branch
-        original_branch = repo.active_branch.name
+        exists = branch in heads
+        # Resolve the tip once: every read below and the update-ref old value use this same commit
+        base = repo.git.rev_parse(f"refs/heads/{branch}") if exists else None
         
-        # Check if CR branch exists
-        if "gitstage/cr-log" not in repo.heads:
-            # Create orphan branch
-            repo.git.checkout("--orphan", "gitstage/cr-log")
-            
-            # Create CR infrastructure
-            cr_dir = Path(".gitstage/change_requests")
-            cr_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Create next_cr.txt with initial value 0001
-            next_cr_file = Path(".gitstage/next_cr.txt")
-            next_cr_file.write_text("0001")
-            
-            # Stage and commit CR infrastructure
-            repo.index.add([".gitstage/change_requests", ".gitstage/next_cr.txt"])
-            repo.index.commit("Initialize GitStage CR log branch")
-            
-            # Push to remote if it exists
-            if "origin" in repo.remotes:
-                repo.git.push("--set-upstream", "origin", "gitstage/cr-log")
-            
-            console.print("[green]✓ Created gitstage/cr-log branch with CR infrastructure[/green]")
-        else:
-            # Switch to CR branch to ensure files are tracked
-            repo.git.checkout("gitstage/cr-log")
-            
-            # Force add any untracked files
-            if Path(".gitstage/next_cr.txt").exists():
-                repo.index.add([".gitstage/next_cr.txt"], force=True)
-            if Path(".gitstage/change_requests").exists():
-                repo.index.add([".gitstage/change_requests"], force=True)
-            
-            # Commit if there are changes
-            if repo.is_dirty():
-                repo.index.commit("chore: ensure CR infrastructure is tracked")
-                if "origin" in repo.remotes:
-                    repo.git.push("origin", "gitstage/cr-log")
-                console.print("[green]✓ Ensured CR infrastructure is tracked[/green]")
+        # One listing of .gitstage/ answers every existence question
+        entries = {}
+        if exists:
+            for entry in split_nul(repo.git.ls_tree("-z", base, ".gitstage/")):
+                info, path = entry.split("\t", 1)
+                entries[path.rsplit("/", 1)[-1]] = info.split()[2]
+        next_cr = entries.get("next_cr.txt")
+        cr_dir = entries.get("change_requests")
+        if next_cr and cr_dir:
+            return False
+        
+        # Create next_cr.txt with initial value 0001 and a placeholder for change_requests/
+        if not next_cr:
+            next_cr = git_with_input(repo, "hash-object", "-w", "--stdin", data=b"0001")
+        if not cr_dir:
+            gitkeep = git_with_input(repo, "hash-object", "-w", "--stdin", data=b"")
+            cr_dir = tree_with_entry(repo, None, "100644", "blob", gitkeep, ".gitkeep")
         
-        # Return to original branch
-        repo.git.checkout(original_branch)
-        console.print(f"[green]✓ Returned to branch:[/] [bold]{original_branch}[/]")
+        # Build .gitstage/ on top of whatever the branch already has
+        gitstage_tree = f"{base}:.gitstage" if entries else None
+        gitstage_tree = tree_with_entry(repo, gitstage_tree, "040000", "tree", cr_dir, "change_requests")
+        gitstage_tree = tree_with_entry(repo, gitstage_tree, "100644", "blob", next_cr, "next_cr.txt")
+        tree = tree_with_entry(repo, base, "040000", "tree", gitstage_tree, ".gitstage")
+        
+        if exists:
+            commit = repo.git.commit_tree(tree, "-p", base, "-m", "chore: ensure CR infrastructure is tracked")
+            repo.git.update_ref(f"refs/heads/{branch}", commit, base)
+            console.print("[green]✓ Ensured CR infrastructure is tracked[/green]")
+        else:
+            # Parentless commit; the all-zero old value makes update-ref refuse to clobber an existing branch
+            commit = repo.git.commit_tree(tree, "-m", "Initialize GitStage CR log branch")
+            repo.git.update_ref(f"refs/heads/{branch}", commit, "0" * 40)
+            heads.add(branch)
+            console.print("[green]✓ Created gitstage/cr-log branch with CR infrastructure[/green]")
+        return True
         
     except Exception as e:
-        # Try to return to original branch
-        try:
-            repo.git.checkout(original_branch)
-            console.print(f"[green]✓ Returned to branch:[/] [bold]{original_branch}[/]")
-        except:
-            pass
         console.print(f"[red]❌ Failed to set up CR infrastructure: {str(e)}[/red]")
         raise
 
@@ -165,62 +230,57 @@ def main(
         "--stages",
         help="List of stages in order (e.g., dev testing main)",
     ),
+    durable: bool = typer.Option(False, "--durable", help="fsync the config file after writing it"),
 ):
     """Initialize GitStage in the current repository."""
     try:
         # Validate stage names
         for stage in stages:
-            if not stage or stage.strip() == "":
-                raise typer.BadParameter(f"Invalid stage name '{stage}': must not be empty or whitespace.")
-            if stage.startswith("-"):
-                raise typer.BadParameter(f"Invalid stage name '{stage}': must not start with a dash.")
-            if not re.fullmatch(r"^[A-Za-z0-9._/-]+$", stage):
-                raise typer.BadParameter(f"Invalid stage name '{stage}': must only contain letters, numbers, dots, underscores, dashes, or slashes.")
+            validate_stage_name(stage)
+        # Drop repeated stages (keeping order) so no two workers commit to the same branch
+        stages = list(dict.fromkeys(stages))
         # Try to get existing repo or initialize new one
         try:
-            repo = Repo('.', search_parent_directories=True)
+            repo = get_repo()
             console.print("[green]✓ Found existing Git repository[/green]")
         except InvalidGitRepositoryError:
             repo = Repo.init('.')
             console.print("[green]✓ Initialized new Git repository[/green]")
         
-        # Save original branch
-        original_branch = repo.active_branch.name
-        
         # Ensure remote exists
         if not repo.remotes:
             console.print("[yellow]⚠ No remote found. Creating 'origin'...[/yellow]")
             repo.create_remote('origin', repo.working_dir)
         
-        # Create and publish branches
+        # Snapshot branches and refs once instead of rescanning .git/refs per check
+        refs = all_refs(repo)
+        heads = {ref[len("refs/heads/"):] for ref in refs if ref.startswith("refs/heads/")}
+        
+        # Create branches
         for stage in stages:
-            # Create branch if it doesn't exist
-            if stage not in repo.heads:
+            if stage not in heads:
                 repo.create_head(stage)
+                heads.add(stage)
                 console.print(f"[green]✓ Created branch: {stage}[/green]")
             else:
                 console.print(f"[yellow]ℹ Branch already exists: {stage}[/yellow]")
-            
-            # Ensure branch is published
-            ensure_branch_published(repo, stage)
-            
-            # Set up .gitignore for mainline branches
-            setup_gitignore(repo, stage)
         
         # Save stageflow configuration
-        save_stageflow(stages)
+        save_stageflow(stages, durable=durable)
         console.print("[green]✓ Saved stageflow configuration[/green]")
         
-        # Commit and push config to all branches
-        for stage in stages:
-            commit_and_push_config(repo, stage, stages)
+        # Commit .gitignore rules and config to all branches, one worker per branch
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(stages)))) as pool:
+            results = list(pool.map(lambda stage: prepare_stage(repo, stage, stages, refs), stages))
+        to_push = [stage for stage, needs_push in zip(stages, results) if needs_push]
         
         # Set up CR infrastructure
-        setup_cr_infrastructure(repo)
+        if setup_cr_infrastructure(repo, heads):
+            to_push.append("gitstage/cr-log")
         
-        # Return to original branch
-        repo.git.checkout(original_branch)
-        console.print(f"[green]✓ Returned to branch:[/] [bold]{original_branch}[/]")
+        # Publish everything in a single push
+        if to_push:
+            push_branches(repo, to_push)
         
         # Show summary
         summary = Panel(
@@ -236,11 +296,5 @@ def main(
         console.print(summary)
         
     except Exception as e:
-        # Try to return to original branch
-        try:
-            repo.git.checkout(original_branch)
-            console.print(f"[green]✓ Returned to branch:[/] [bold]{original_branch}[/]")
-        except:
-            pass
         console.print(f"[red]❌ Error: {str(e)}[/red]")
         raise typer.Exit(1) 
\ No newline at end of file
@@ -1,5 +1,4 @@
 import typer
-from git import Repo
 from rich.console import Console
 from rich.table import Table
 
@@ -16,14 +15,12 @@ def promote(
         help="Target branch to promote to (testing or main)",
         callback=lambda x: x if x in ["testing", "main"] else typer.BadParameter("Target must be 'testing' or 'main'")
     ),
+    checkout: bool = typer.Option(False, "--checkout", help="Check out the target branch after promoting"),
 ):
     """Promote changes from dev to testing or main branch."""
     try:
         # Verify Git repository
-        require_git_repo()
-        
-        # Get the current repository
-        repo = Repo(".")
+        repo = require_git_repo()
         
         # Ensure we're on the dev branch
         if repo.active_branch.name != "dev":
@@ -55,13 +52,24 @@ def promote(
             console.print("[yellow]Promotion cancelled.[/yellow]")
             raise typer.Exit(0)
         
-        # Create and checkout target branch
-        target_branch = repo.create_head(target, latest_commit)
-        target_branch.checkout()
+        # Only fast-forward the local target branch; never drop commits it has that dev lacks
+        target_ref = f"refs/heads/{target}"
+        old_sha = repo.git.rev_parse("--verify", "-q", target_ref, with_exceptions=False) or "0" * 40
+        if old_sha != "0" * 40:
+            status, _, _ = repo.git.merge_base(
+                "--is-ancestor", old_sha, latest_commit.hexsha,
+                with_extended_output=True, with_exceptions=False
+            )
+            if status != 0:
+                console.print(f"[red]❌ Local {target} has commits that are not in dev; refusing to move it.[/red]")
+                raise typer.Exit(1)
+        
+        # Push the commit straight to the target branch, then point the local branch at it
+        repo.git.push("origin", f"{latest_commit.hexsha}:{target_ref}")
+        repo.git.update_ref(target_ref, latest_commit.hexsha, old_sha)
         
-        # Push to target branch
-        origin = repo.remote("origin")
-        origin.push(target)
+        if checkout:
+            repo.heads[target].checkout()
         
         console.print(f"[green]Successfully promoted changes to {target} branch![/green]")
         
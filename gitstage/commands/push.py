@@ -1,84 +1,279 @@
+import json
+import re
+import sys
+import time
 import typer
-from git import Repo
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+from git import GitCommandError, Repo
 from rich.console import Console
 from rich.prompt import Confirm, Prompt
 from rich.table import Table
 from rich.panel import Panel
 from typing import List, Optional, Tuple
 
-from gitstage.commands.utils import record_change, require_git_repo, get_stageflow, get_change
+from gitstage.commands._repo import all_refs
+from gitstage.commands.utils import record_change, session_scope, require_git_repo, get_stageflow, get_change, stage_index, git_add, git_checkout_paths, split_nul
 
 console = Console()
 
+# How long a recorded "branch is synced" result may be reused
+SYNC_CACHE_TTL = 60
+
+# Promotions made with --defer, pushed later by `gitstage flush-push`
+PENDING_PUSH_FILE = Path.home() / ".gitstage" / "pending_push.jsonl"
+
 def get_next_stage(current_stage: str) -> Optional[str]:
     """Get the next stage in the stageflow after the current stage."""
     stages = get_stageflow()
-    try:
-        current_index = stages.index(current_stage)
-        if current_index < len(stages) - 1:
-            return stages[current_index + 1]
-    except ValueError:
-        pass
+    current_index = stage_index(tuple(stages)).get(current_stage)
+    if current_index is not None and current_index < len(stages) - 1:
+        return stages[current_index + 1]
     return None
 
-def ensure_branch_synced(repo: Repo, branch: str) -> bool:
-    """Ensure a branch is synced with origin."""
+def _sync_cache_path(repo: Repo) -> Path:
+    # Kept inside .git so it never shows up as an untracked file on any branch
+    return Path(repo.git_dir) / "gitstage_sync_cache.json"
+
+def _load_sync_cache(repo: Repo) -> dict:
+    try:
+        return json.loads(_sync_cache_path(repo).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _branch_shas(repo: Repo, branch: str) -> Tuple[str, str]:
+    """Return the (local, origin) commit hashes of a branch by reading its refs."""
+    return repo.heads[branch].commit.hexsha, repo.refs[f"origin/{branch}"].commit.hexsha
+
+def is_sync_cached(repo: Repo, branch: str) -> bool:
+    """Check whether the branch was recently recorded as synced at its current local and origin commits."""
+    entry = _load_sync_cache(repo).get(branch)
+    if not entry or time.time() - entry["checked"] > SYNC_CACHE_TTL:
+        return False
+    try:
+        return _branch_shas(repo, branch) == (entry["local"], entry["remote"])
+    except (IndexError, ValueError):
+        return False
+
+def record_synced(repo: Repo, branch: str) -> None:
+    """Record that the branch is synced with origin at its current commits."""
+    try:
+        local_sha, remote_sha = _branch_shas(repo, branch)
+    except (IndexError, ValueError):
+        return
+    cache = _load_sync_cache(repo)
+    cache[branch] = {"local": local_sha, "remote": remote_sha, "checked": time.time()}
+    _sync_cache_path(repo).write_text(json.dumps(cache, indent=2))
+
+def defer_push(repo: Repo, branch: str, commit_hash: str) -> None:
+    """Queue a promotion to be pushed by `gitstage flush-push`."""
+    PENDING_PUSH_FILE.parent.mkdir(parents=True, exist_ok=True)
+    entry = {"repo": repo.working_dir, "branch": branch, "commit": commit_hash}
+    with PENDING_PUSH_FILE.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def load_deferred_pushes() -> List[dict]:
+    """Return all queued promotions, across repositories."""
     try:
+        lines = PENDING_PUSH_FILE.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return []
+    return [json.loads(line) for line in lines if line.strip()]
+
+def save_deferred_pushes(entries: List[dict]) -> None:
+    """Rewrite the queue with the given entries, removing it when empty."""
+    if not entries:
+        PENDING_PUSH_FILE.unlink(missing_ok=True)
+        return
+    PENDING_PUSH_FILE.write_text("".join(json.dumps(e) + "\n" for e in entries), encoding="utf-8")
+
+def ensure_branch_synced(repo: Repo, branch: str, use_cache: bool = True, assume_yes: bool = False) -> bool:
+    """Ensure a branch is synced with origin. With assume_yes, unpushed commits are pushed without asking."""
+    try:
+        # Skip the history walk if nothing moved since the last check
+        if use_cache and is_sync_cached(repo, branch):
+            return True
+        
         # Check if branch is ahead of origin
         ahead_count = repo.git.rev_list("--left-only", "--count", f"{branch}...origin/{branch}")
         if int(ahead_count) > 0:
             console.print(f"[yellow]⚠️ Branch '{branch}' has {ahead_count} unpushed commits.[/yellow]")
-            if Confirm.ask(f"Push {branch} to origin?", default=True):
+            if assume_yes or Confirm.ask(f"Push {branch} to origin?", default=True):
                 repo.git.push("origin", branch)
                 console.print(f"[green]✅ Pushed {branch} to origin.[/green]")
+                record_synced(repo, branch)
                 return True
             return False
+        record_synced(repo, branch)
         return True
     except Exception as e:
         console.print(f"[red]❌ Error checking branch sync: {str(e)}[/red]")
         return False
 
+def _status(repo: Repo) -> Tuple[List[str], List[str]]:
+    """Classify the worktree in one `git status --porcelain=v2 -z` scan.
+    Returns (modified, untracked); modified covers staged, unstaged, renamed and unmerged paths."""
+    modified, untracked = [], []
+    records = iter(split_nul(repo.git.status(porcelain="v2", z=True, untracked_files="all")))
+    for record in records:
+        kind = record[:1]
+        if kind == "1":
+            modified.append(record.split(" ", 8)[8])
+        elif kind == "2":
+            modified.append(record.split(" ", 9)[9])
+            next(records, None)  # skip the rename/copy source path
+        elif kind == "u":
+            modified.append(record.split(" ", 10)[10])
+        elif kind == "?":
+            untracked.append(record[2:])
+    return modified, untracked
+
 def get_changes(repo: Repo, branch: str) -> Tuple[List[str], List[str]]:
     """Get committed and uncommitted changes for a branch."""
     # Get committed changes
     committed = []
     try:
-        diff_output = repo.git.diff(f"origin/{branch}..{branch}", name_only=True)
-        committed = [f.strip() for f in diff_output.split("\n") if f.strip()]
+        committed = split_nul(repo.git.diff("-z", "--name-only", f"origin/{branch}..{branch}"))
     except Exception:
         pass
     
-    # Get uncommitted changes
-    uncommitted = []
-    if repo.is_dirty(untracked_files=True):
-        for item in repo.index.diff(None):
-            uncommitted.append(item.a_path)
-        for item in repo.untracked_files:
-            uncommitted.append(item)
+    # Get uncommitted changes (tracked and untracked)
+    modified, untracked = _status(repo)
+    return committed, modified + untracked
+
+_SELECT_HEADER = (
+    "# Delete or comment out the files you do not want to include.\n"
+    "# Other lines starting with '#' are ignored.\n"
+)
+
+def _selected_from_template(edited: str, files: List[str]) -> List[str]:
+    """Return the files whose exact line was kept in the edited template, in their original order.
+    Lines are not stripped, so names with a leading '#' or surrounding spaces still match."""
+    lines = edited.splitlines()
+    chosen = set(lines) & set(files)
+    header = set(_SELECT_HEADER.splitlines())
+    for line in lines:
+        if line in chosen or line in header or not line.strip() or line.startswith("#"):
+            continue
+        console.print(f"[yellow]⚠️ Ignoring '{line}': not one of the changed files[/yellow]")
+    return [file for file in files if file in chosen]
+
+def select_files(files: List[str], legacy_prompt: bool = False) -> List[str]:
+    """Let the user pick files in a single editor session, with all files preselected.
+    Falls back to a numbered list and one selection prompt when --legacy-prompt is set or no terminal is attached."""
+    if not legacy_prompt and sys.stdin.isatty():
+        template = _SELECT_HEADER + "".join(f"{file}\n" for file in files)
+        edited = typer.edit(template, extension=".txt")
+        if edited is None:
+            # Editor closed without saving: keep the preselected files
+            return list(files)
+        return _selected_from_template(edited, files)
+    
+    table = Table(title="Changed files", show_header=True, header_style="bold")
+    table.add_column("#", style="cyan", justify="right")
+    table.add_column("File")
+    for number, file in enumerate(files, 1):
+        table.add_row(str(number), file)
+    console.print(table)
+    
+    response = Prompt.ask("Files to include (e.g. 1,3,5 or 'a' for all)", default="", show_default=False)
+    if response.strip().lower() == "a":
+        return list(files)
+    
+    chosen = set()
+    for part in response.split(","):
+        part = part.strip()
+        if part.isdigit() and 1 <= int(part) <= len(files):
+            chosen.add(int(part) - 1)
+        elif part:
+            console.print(f"[yellow]⚠️ Ignoring invalid selection '{part}'[/yellow]")
+    return [files[i] for i in sorted(chosen)]
+
+def _edit_message(repo: Repo, summary: Optional[str] = None, test_plan: Optional[str] = None) -> Tuple[str, str]:
+    """Ask for the summary and test plan in one $EDITOR session, like git's COMMIT_EDITMSG.
+    Values already given are prefilled; falls back to prompts when no terminal is attached."""
+    if summary and test_plan:
+        return summary, test_plan
+    if not sys.stdin.isatty():
+        if summary is None:
+            summary = Prompt.ask(
+                "Enter a brief summary of the changes",
+                default="",
+                show_default=False
+            )
+        if test_plan is None:
+            test_plan = Prompt.ask(
+                "Describe how this change was tested",
+                default="",
+                show_default=False
+            )
+        return summary, test_plan
+    
+    message_file = Path(repo.git_dir) / "GITSTAGE_EDITMSG"
+    message_file.write_text(
+        "# Summary:\n"
+        f"{summary or ''}\n"
+        "# Test Plan:\n"
+        f"{test_plan or ''}\n"
+        "# Write the summary and test plan under their headings.\n"
+        "# Other lines starting with '#' are ignored.\n",
+        encoding="utf-8"
+    )
+    typer.edit(filename=str(message_file))
     
-    return committed, uncommitted
+    sections = {"summary": [], "test_plan": []}
+    current = None
+    for line in message_file.read_text(encoding="utf-8").splitlines():
+        header = line.strip().lower()
+        if header == "# summary:":
+            current = "summary"
+        elif header == "# test plan:":
+            current = "test_plan"
+        elif not line.lstrip().startswith("#") and current:
+            sections[current].append(line)
+    return "\n".join(sections["summary"]).strip(), "\n".join(sections["test_plan"]).strip()
+
+def _worktree_clean(repo: Repo) -> bool:
+    """Cheap check for no tracked modifications and no untracked files."""
+    status, _, _ = repo.git.diff("HEAD", "--quiet", with_extended_output=True, with_exceptions=False)
+    if status != 0:
+        return False
+    return not repo.git.ls_files(others=True, exclude_standard=True)
 
-def handle_changes(repo: Repo, branch: str, all_files: bool = False) -> Optional[str]:
-    """Handle changes in the working directory."""
+def handle_changes(
+    repo: Repo,
+    branch: str,
+    all_files: bool = False,
+    legacy_prompt: bool = False,
+    summary: Optional[str] = None,
+    test_plan: Optional[str] = None,
+    display: bool = True,
+) -> Optional[str]:
+    """Handle changes in the working directory.
+    A summary and test plan given up front are used for the commit instead of asking."""
+    # With --all there is nothing to ask; only build the file lists if there is something to commit
+    if all_files and _worktree_clean(repo):
+        return None
+    
     committed, uncommitted = get_changes(repo, branch)
     
     if not committed and not uncommitted:
         return None
     
     # Show changes
-    if committed:
+    if display and committed:
         console.print("\n[bold cyan]💡 Committed changes not yet pushed:[/bold cyan]")
-        for file in committed:
-            console.print(f"  [green]+ {file}[/green]")
+        console.print("\n".join(f"  [green]+ {file}[/green]" for file in committed))
     
-    if uncommitted:
+    if display and uncommitted:
         console.print("\n[bold cyan]💡 Uncommitted changes:[/bold cyan]")
-        for file in uncommitted:
-            console.print(f"  [yellow]+ {file}[/yellow]")
+        console.print("\n".join(f"  [yellow]+ {file}[/yellow]" for file in uncommitted))
     
     # Ask how to proceed
     if committed and uncommitted:
-        console.print("\n[bold]You have both committed and uncommitted changes.[/bold]")
+        if display:
+            console.print("\n[bold]You have both committed and uncommitted changes.[/bold]")
         if all_files:
             choice = "commit-all"
         else:
@@ -96,87 +291,81 @@ def handle_changes(repo: Repo, branch: str, all_files: bool = False) -> Optional
         return None
     
     # Get commit message and test plan
-    console.print("\n[bold]Please describe your changes:[/bold]")
-    summary = Prompt.ask(
-        "Enter a brief summary of the changes",
-        default="",
-        show_default=False
-    )
-    
-    test_plan = Prompt.ask(
-        "Describe how this change was tested",
-        default="",
-        show_default=False
-    )
+    if not (summary and test_plan):
+        console.print("\n[bold]Please describe your changes:[/bold]")
+    summary, test_plan = _edit_message(repo, summary, test_plan)
     
     # Handle changes based on choice
     if choice == "commit-all" or all_files:
-        repo.index.add("*")
+        repo.git.add("-A")
     else:  # select-changes
-        console.print("\n[bold]Select which changes to commit (y/n/a for all):[/bold]")
-        for file in uncommitted:
-            response = Prompt.ask(
-                f"Include {file}?",
-                choices=["y", "n", "a"],
-                default="n",
-                show_choices=False
-            )
-            if response == "a":
-                repo.index.add("*")
-                break
-            elif response == "y":
-                repo.index.add(file)
+        selected = select_files(uncommitted, legacy_prompt)
+        if selected:
+            git_add(repo, selected)
     
     # Create commit
     commit = repo.index.commit(f"{summary}\n\nTest Plan:\n{test_plan}")
     console.print(f"[green]✓ Committed changes: {commit.hexsha}[/green]")
     return commit.hexsha
 
-def show_diff(repo: Repo, branch_from: str, branch_to: str) -> List[str]:
-    """Show diff between branches and return list of changed files."""
-    try:
-        diff_output = repo.git.diff(f"{branch_from}..{branch_to}", name_only=True)
-        changed_files = [f.strip() for f in diff_output.split("\n") if f.strip()]
-        
-        if changed_files:
-            console.print("\n[bold cyan]💡 Detected file changes between branches:[/bold cyan]")
-            for file in changed_files:
-                console.print(f"  [green]+ {file}[/green]")
-        else:
-            console.print(f"[yellow]⚠️ No changes detected between [bold]{branch_from}[/bold] and [bold]{branch_to}[/bold].[/yellow]")
-        
-        return changed_files
-    except Exception as e:
-        console.print(f"[red]Error getting diff: {str(e)}[/red]")
-        return []
+BranchState = namedtuple("BranchState", "files has_commits is_already_promoted")
+
+_PROMOTED_RE = re.compile(rb"Promoted from (\S+) commit: ([0-9a-f]{40})")
+
+def _promoted_in_recent(repo: Repo, branch_from: str, from_sha: str, to_sha: str, limit: int = 200) -> bool:
+    """Fallback for when git log --grep fails: scan the last `limit` commits of to_sha."""
+    branch, sha = branch_from.encode(), from_sha.encode()
+    for commit in repo.iter_commits(to_sha, max_count=limit):
+        match = _PROMOTED_RE.search(commit.message.encode())
+        if match and match.group(1) == branch and match.group(2) == sha:
+            return True
+    return False
 
-def validate_branch_changes(repo: Repo, branch_from: str, branch_to: str) -> Tuple[bool, bool, bool]:
-    """Validate changes between branches.
-    Returns (has_commits, has_file_changes, is_already_promoted)"""
+@lru_cache(maxsize=32)
+def _branch_state(repo: Repo, branch_from: str, from_sha: str, to_sha: str) -> BranchState:
+    # Changed files. Order matters: git diff detects renames, so diffing to -> from lists
+    # branch_from's (post-rename) paths, which are the ones that can be checked out from it
+    files = tuple(split_nul(repo.git.diff("-z", "--name-only", to_sha, from_sha)))
+    
+    # Whether branch_from has any commit branch_to lacks; stop at the first one
+    has_commits = int(repo.git.rev_list("--count", "--max-count=1", f"{to_sha}..{from_sha}")) > 0
+    
+    # Check if the last commit was already promoted; git stops at the first match
+    is_already_promoted = False
+    if has_commits and not files:
+        marker = f"Promoted from {branch_from} commit: {from_sha}"
+        try:
+            is_already_promoted = bool(repo.git.log(
+                to_sha, "--fixed-strings", f"--grep={marker}", "--format=%H", "--max-count=1"
+            ))
+        except GitCommandError:
+            is_already_promoted = _promoted_in_recent(repo, branch_from, from_sha, to_sha)
+    
+    return BranchState(files, has_commits, is_already_promoted)
+
+def compute_branch_state(repo: Repo, branch_from: str, branch_to: str) -> BranchState:
+    """Compare branch_from against branch_to with one diff and one rev-list.
+    Cached on the branches' commit ids, so repeated calls in a process reuse the result."""
     try:
-        # Check for commits
-        commits = list(repo.iter_commits(f"{branch_to}..{branch_from}"))
-        has_commits = len(commits) > 0
-        
-        # Check for file changes
-        diff_output = repo.git.diff(f"{branch_to}..{branch_from}", name_only=True)
-        has_file_changes = bool(diff_output.strip())
-        
-        # Check if the last commit was already promoted
-        is_already_promoted = False
-        if has_commits and not has_file_changes:
-            # Get the last commit from branch_from
-            last_commit = commits[0]
-            # Check if this commit's hash appears in any commit message in branch_to
-            for commit in repo.iter_commits(branch_to):
-                if f"Promoted from {branch_from} commit: {last_commit.hexsha}" in commit.message:
-                    is_already_promoted = True
-                    break
-        
-        return has_commits, has_file_changes, is_already_promoted
+        return _branch_state(repo, branch_from, repo.commit(branch_from).hexsha, repo.commit(branch_to).hexsha)
     except Exception as e:
-        console.print(f"[red]❌ Error validating branch changes: {str(e)}[/red]")
-        return False, False, False
+        console.print(f"[red]❌ Error comparing branches: {str(e)}[/red]")
+        return BranchState((), False, False)
+
+def show_diff(repo: Repo, branch_from: str, branch_to: str, display: bool = True) -> List[str]:
+    """Show diff between branches and return list of changed files."""
+    changed_files = list(compute_branch_state(repo, branch_from, branch_to).files)
+    
+    if not display:
+        return changed_files
+    
+    if changed_files:
+        console.print("\n[bold cyan]💡 Detected file changes between branches:[/bold cyan]")
+        console.print("\n".join(f"  [green]+ {file}[/green]" for file in changed_files))
+    else:
+        console.print(f"[yellow]⚠️ No changes detected between [bold]{branch_from}[/bold] and [bold]{branch_to}[/bold].[/yellow]")
+    
+    return changed_files
 
 def main(
     branch_from: str = typer.Option(None, help="Source branch (default: current)"),
@@ -186,14 +375,17 @@ def main(
     test_plan: str = typer.Option(None, help="Test plan for the changes"),
     all: bool = typer.Option(False, "--all", "-a", help="Include all files without asking"),
     force: bool = typer.Option(False, "--force-promote", "-f", help="Force promotion even if no file changes are detected"),
+    legacy_prompt: bool = typer.Option(False, "--legacy-prompt", help="Pick files from a numbered list instead of opening an editor"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always recheck whether the source branch is synced with origin"),
+    defer: bool = typer.Option(False, "--defer", help="Commit now but queue the push for `gitstage flush-push`"),
 ):
     """Record a change and push it to the next stage in the workflow."""
     try:
         # Verify Git repository
-        require_git_repo()
+        repo = require_git_repo()
         
-        # Get the current repository
-        repo = Repo(".")
+        # Everything was given on the command line: nothing to prompt for, only the output is skipped
+        non_interactive = bool(all and files and summary and test_plan)
         
         # Determine source and destination branches
         if not branch_from:
@@ -208,24 +400,28 @@ def main(
             console.print(f"[green]✓ Using next stage as destination: {branch_to}[/green]")
         
         # Ensure branches exist
-        if branch_from not in repo.heads:
+        refs = all_refs(repo)
+        if f"refs/heads/{branch_from}" not in refs:
             console.print(f"[red]❌ Source branch '{branch_from}' does not exist![/red]")
             raise typer.Exit(1)
-        if branch_to not in repo.heads:
+        if f"refs/heads/{branch_to}" not in refs:
             console.print(f"[red]❌ Destination branch '{branch_to}' does not exist![/red]")
             raise typer.Exit(1)
         
         # Handle changes and ensure branch is synced
-        handle_changes(repo, branch_from, all)
-        if not ensure_branch_synced(repo, branch_from):
+        handle_changes(
+            repo, branch_from, all, legacy_prompt,
+            summary=summary, test_plan=test_plan, display=not non_interactive
+        )
+        if not ensure_branch_synced(repo, branch_from, use_cache=not no_cache, assume_yes=non_interactive):
             console.print("[yellow]⚠️ Skipping promotion due to unsynced source branch.[/yellow]")
             raise typer.Exit(1)
         
         # Validate branch changes
-        has_commits, has_file_changes, is_already_promoted = validate_branch_changes(repo, branch_from, branch_to)
+        state = compute_branch_state(repo, branch_from, branch_to)
         
-        if has_commits and not has_file_changes:
-            if is_already_promoted:
+        if state.has_commits and not state.files:
+            if state.is_already_promoted:
                 console.print("[green]✅ No changes to promote. Skipping push.[/green]")
                 raise typer.Exit(0)
             elif not force:
@@ -244,25 +440,14 @@ def main(
                 console.print("[yellow]⚠️ Proceeding with promotion due to --force-promote flag.[/yellow]")
         
         # Show diff and get changed files
-        changed_files = show_diff(repo, branch_from, branch_to)
+        changed_files = show_diff(repo, branch_from, branch_to, display=not non_interactive)
         if not changed_files:
             if not all and not Confirm.ask("Do you want to continue and manually select files?", default=False):
                 raise typer.Exit(0)
         
         # Get summary and test plan if not provided
-        if not summary:
-            summary = Prompt.ask(
-                "Enter a brief summary of the changes",
-                default="",
-                show_default=False
-            )
-        
-        if not test_plan:
-            test_plan = Prompt.ask(
-                "Describe how this change was tested",
-                default="",
-                show_default=False
-            )
+        if not summary or not test_plan:
+            summary, test_plan = _edit_message(repo, summary or None, test_plan or None)
         
         # Determine which files to include
         files_to_add = []
@@ -276,19 +461,7 @@ def main(
             files_to_add = changed_files
         else:
             # Interactive file selection
-            console.print("\n[bold]Select which files to include in the push (y/n/a for all):[/bold]")
-            for file in changed_files:
-                response = Prompt.ask(
-                    f"Include {file}?",
-                    choices=["y", "n", "a"],
-                    default="n",
-                    show_choices=False
-                )
-                if response == "a":
-                    files_to_add = changed_files
-                    break
-                elif response == "y":
-                    files_to_add.append(file)
+            files_to_add = select_files(changed_files, legacy_prompt)
         
         if not files_to_add:
             console.print("[red]❌ No files selected for commit. Aborting push.[/red]")
@@ -313,37 +486,43 @@ def main(
         repo.heads[branch_to].checkout()
         
         # Get the original commit hash for reference
-        original_commit = repo.git.rev_parse(branch_from)
+        original_commit = repo.heads[branch_from].commit.hexsha
         
         # Create new commit with selected files
-        for file in files_to_add:
-            repo.git.checkout(branch_from, "--", file)
+        git_checkout_paths(repo, branch_from, files_to_add)
         
         # Stage selected files
-        repo.index.add(files_to_add)
+        git_add(repo, files_to_add)
         
         # Create commit with reference to original
         commit_message = f"{summary}\n\nTest Plan:\n{test_plan}\n\nPromoted from {branch_from} commit: {original_commit}"
         commit = repo.index.commit(commit_message)
         
-        # Push to destination branch
-        origin = repo.remote("origin")
-        origin.push(branch_to)
+        # Push to destination branch, or queue it for a single batched push
+        if defer:
+            defer_push(repo, branch_to, commit.hexsha)
+        else:
+            origin = repo.remote("origin")
+            origin.push(branch_to)
+            record_synced(repo, branch_to)
         
         # Record the change
-        record_change(
-            commit_hash=commit.hexsha,
-            summary=summary,
-            test_plan=test_plan
-        )
+        with session_scope() as session:
+            record_change(
+                commit_hash=commit.hexsha,
+                summary=summary,
+                test_plan=test_plan,
+                session=session
+            )
         
         # Switch back to source branch
         console.print(f"[yellow]Switching back to {branch_from} branch...[/yellow]")
         repo.heads[branch_from].checkout()
         
         # Show success message
+        action = "queued a push of" if defer else "pushed"
         success_panel = Panel(
-            f"Successfully pushed changes to {branch_to}!\n"
+            f"Successfully {action} changes to {branch_to}!\n"
             f"Commit hash: {commit.hexsha}\n"
             f"Original commit: {original_commit}",
             title="🎉 Success",
@@ -1,14 +1,20 @@
+from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Optional, List
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, List, Tuple
 import json
+import os
+import subprocess
 
-from sqlalchemy import Column, DateTime, Enum as SQLEnum, Integer, String, create_engine
+from sqlalchemy import Column, DateTime, Enum as SQLEnum, Index, Integer, String, create_engine, event, insert, select, update
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
-from git import InvalidGitRepositoryError, Repo
+from git import GitCommandError, InvalidGitRepositoryError, Repo
 import typer
 
+from gitstage.commands._repo import get_repo
+
 class ChangeStatus(str, Enum):
     PENDING = "pending"
     APPROVED = "approved"
@@ -19,6 +25,9 @@ class Base(DeclarativeBase):
 
 class Change(Base):
     __tablename__ = "changes"
+    # commit_hash is already indexed through its UNIQUE constraint; this one
+    # serves status filters and the pending list ordered by creation time
+    __table_args__ = (Index("ix_changes_status_created", "status", "created_at"),)
 
     id = Column(Integer, primary_key=True)
     commit_hash = Column(String, unique=True)
@@ -28,75 +37,211 @@ class Change(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+# Engine and session factory are created once per process
+_ENGINE = None
+_SESSION = None
+
+# Pending list cached per process; every write helper bumps the version once
+# its transaction has committed
+_pending_version = 0
+_pending_cache: Tuple[int, List["Change"]] = (-1, [])
+
+def _invalidate_pending() -> None:
+    global _pending_version
+    _pending_version += 1
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 def get_db_session() -> Session:
-    db_path = Path.home() / ".gitstage" / "changes.db"
-    db_path.parent.mkdir(exist_ok=True)
-    
-    engine = create_engine(f"sqlite:///{db_path}")
-    Base.metadata.create_all(engine)
-    
-    SessionLocal = sessionmaker(bind=engine)
-    return SessionLocal()
+    global _ENGINE, _SESSION
+    if _ENGINE is None:
+        db_path = Path.home() / ".gitstage" / "changes.db"
+        db_path.parent.mkdir(exist_ok=True)
+        
+        _ENGINE = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+        event.listen(_ENGINE, "connect", _set_sqlite_pragmas)
+        Base.metadata.create_all(_ENGINE)
+        # create_all skips indexes on tables that already exist
+        for index in Change.__table__.indexes:
+            index.create(_ENGINE, checkfirst=True)
+        
+        _SESSION = sessionmaker(bind=_ENGINE, expire_on_commit=False)
+    return _SESSION()
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """One transaction for a block of work: commit on success, roll back on error."""
+    session = get_db_session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
 
 def record_change(
     commit_hash: str,
     summary: str,
     test_plan: str,
-    status: ChangeStatus = ChangeStatus.PENDING
+    status: ChangeStatus = ChangeStatus.PENDING,
+    session: Optional[Session] = None
 ) -> Change:
-    with get_db_session() as session:
-        change = Change(
-            commit_hash=commit_hash,
-            summary=summary,
-            test_plan=test_plan,
-            status=status
-        )
+    change = Change(
+        commit_hash=commit_hash,
+        summary=summary,
+        test_plan=test_plan,
+        status=status
+    )
+    if session is not None:
+        # The caller's session_scope owns the commit; invalidate once it lands
         session.add(change)
-        session.commit()
+        session.flush()
+        event.listen(session, "after_commit", lambda s: _invalidate_pending(), once=True)
         return change
+    with session_scope() as session:
+        session.add(change)
+    _invalidate_pending()
+    return change
+
+def record_changes(rows: List[dict]) -> int:
+    """Insert many changes in a single executemany. Returns the number of rows."""
+    if not rows:
+        return 0
+    with session_scope() as session:
+        session.execute(insert(Change), rows)
+    _invalidate_pending()
+    return len(rows)
 
 def get_change(commit_hash: str) -> Optional[Change]:
     with get_db_session() as session:
-        return session.query(Change).filter(Change.commit_hash == commit_hash).first()
+        return session.execute(
+            select(Change).where(Change.commit_hash == commit_hash)
+        ).scalar_one_or_none()
 
 def get_pending_changes() -> List[Change]:
     """Get all pending changes from the database."""
+    global _pending_cache
+    version, changes = _pending_cache
+    if version == _pending_version:
+        return list(changes)
     with get_db_session() as session:
-        return session.query(Change).filter(Change.status == ChangeStatus.PENDING).all()
+        changes = (
+            session.query(Change)
+            .filter(Change.status == ChangeStatus.PENDING)
+            .order_by(Change.created_at)
+            .all()
+        )
+    _pending_cache = (_pending_version, changes)
+    return list(changes)
 
 def update_change_status(commit_hash: str, status: ChangeStatus) -> Optional[Change]:
-    with get_db_session() as session:
-        change = session.query(Change).filter(Change.commit_hash == commit_hash).first()
-        if change:
-            change.status = status
-            session.commit()
-        return change
+    # A bulk UPDATE then a SELECT in one transaction; UPDATE ... RETURNING would
+    # need SQLite 3.35+
+    with session_scope() as session:
+        session.execute(
+            update(Change)
+            .where(Change.commit_hash == commit_hash)
+            .values(status=status, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        change = session.execute(
+            select(Change).where(Change.commit_hash == commit_hash)
+        ).scalar_one_or_none()
+    _invalidate_pending()
+    return change
 
 def update_all_pending_changes(status: ChangeStatus) -> int:
     """Update all pending changes to the specified status. Returns the number of changes updated."""
     with get_db_session() as session:
-        result = session.query(Change).filter(Change.status == ChangeStatus.PENDING).update(
-            {Change.status: status}
+        result = session.execute(
+            update(Change)
+            .where(Change.status == ChangeStatus.PENDING)
+            .values(status=status)
+            .execution_options(synchronize_session=False)
         )
         session.commit()
-        return result
+    _invalidate_pending()
+    return result.rowcount
 
-def require_git_repo():
-    """Verify the user is inside a Git repository."""
+def require_git_repo() -> Repo:
+    """Verify the user is inside a Git repository and return it (opened once per process)."""
     try:
-        Repo('.', search_parent_directories=True)
+        return get_repo()
     except InvalidGitRepositoryError:
         typer.secho("❌ Not inside a Git repository.", fg=typer.colors.RED)
         raise typer.Exit(1)
 
+def git_with_input(repo: Repo, *args: str, data: bytes) -> str:
+    """Run a git command in the repository, feeding data on stdin. Returns stripped stdout."""
+    command = ["git", *args]
+    result = subprocess.run(command, input=data, cwd=repo.working_dir, capture_output=True)
+    if result.returncode != 0:
+        raise GitCommandError(command, result.returncode, result.stderr)
+    return result.stdout.decode("utf-8").strip()
+
+@lru_cache(maxsize=1)
+def _load_stageflow(path: str, mtime_ns: int) -> Tuple[str, ...]:
+    """Parse the stageflow config; cached per (path, mtime) so edits are picked up."""
+    return tuple(json.loads(Path(path).read_text())["stages"])
+
+def split_nul(output: str) -> List[str]:
+    """Split NUL-delimited git output (from -z) into its non-empty records."""
+    return [record for record in output.split("\0") if record]
+
+def _nul_paths(paths: List[str]) -> bytes:
+    """Encode paths as NUL-terminated records for --pathspec-file-nul."""
+    return b"".join(path.encode("utf-8") + b"\0" for path in paths)
+
+def git_add(repo: Repo, paths: List[str]) -> None:
+    """Stage paths with a single `git add`, streaming them NUL-separated on stdin."""
+    git_with_input(repo, "add", "--pathspec-from-file=-", "--pathspec-file-nul", data=_nul_paths(paths))
+
+def git_checkout_paths(repo: Repo, tree_ish: str, paths: List[str]) -> None:
+    """Check out paths from tree_ish with a single `git checkout`, streaming them on stdin."""
+    git_with_input(repo, "checkout", tree_ish, "--pathspec-from-file=-", "--pathspec-file-nul", data=_nul_paths(paths))
+
 def get_stageflow() -> List[str]:
     """Get the stageflow configuration from .gitstage_config.json."""
     config = Path(".gitstage_config.json")
-    if config.exists():
-        return json.loads(config.read_text())["stages"]
-    return ["dev", "testing", "main"]
+    try:
+        mtime_ns = config.stat().st_mtime_ns
+    except FileNotFoundError:
+        return ["dev", "testing", "main"]
+    return list(_load_stageflow(str(config.resolve()), mtime_ns))
+
+@lru_cache(maxsize=8)
+def stage_index(stages: Tuple[str, ...]) -> Dict[str, int]:
+    """Map each stage name to its position in the stageflow."""
+    return {stage: i for i, stage in enumerate(stages)}
+
+def stageflow_json(stages: List[str]) -> str:
+    """Serialize the stageflow configuration as stored in .gitstage_config.json."""
+    return json.dumps({"stages": stages}, indent=2)
 
-def save_stageflow(stages: List[str]):
-    """Save the stageflow configuration to .gitstage_config.json."""
+def save_stageflow(stages: List[str], durable: bool = False):
+    """Save the stageflow configuration to .gitstage_config.json.
+    Skips the write if the file already has this content; fsyncs only when durable is set."""
     config = Path(".gitstage_config.json")
-    config.write_text(json.dumps({"stages": stages}, indent=2))
+    data = stageflow_json(stages).encode("utf-8")
+    try:
+        if config.read_bytes() == data:
+            return
+    except FileNotFoundError:
+        pass
+    
+    fd = os.open(config, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        os.write(fd, data)
+        if durable:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+    
+    # The mtime key can miss a rewrite within the filesystem's timestamp granularity
+    _load_stageflow.cache_clear()
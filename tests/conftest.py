@@ -0,0 +1,199 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+GIT_CONFIG = """\
+[user]
+    name = Test
+    email = test@example.com
+[init]
+    defaultBranch = main
+[core]
+    fsync = none
+"""
+
+def run_git(repo_path, *args):
+    """Run git directly in repo_path; cheaper than going through GitPython."""
+    result = subprocess.run(["git", "-C", str(repo_path), *args], capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+@pytest.fixture(scope="session", autouse=True)
+def _git_env(tmp_path_factory):
+    """Isolate git from the developer's config once for the whole session."""
+    config_path = tmp_path_factory.mktemp("git_home") / "gitconfig"
+    config_path.write_text(GIT_CONFIG)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("GIT_CONFIG_GLOBAL", str(config_path))
+        mp.setenv("GIT_CONFIG_NOSYSTEM", "1")
+        # The change database lives under ~/.gitstage; keep it out of the real home
+        mp.setenv("HOME", str(config_path.parent))
+        for role in ("AUTHOR", "COMMITTER"):
+            mp.setenv(f"GIT_{role}_NAME", "Test")
+            mp.setenv(f"GIT_{role}_EMAIL", "test@example.com")
+            mp.setenv(f"GIT_{role}_DATE", "2024-01-01T00:00:00+0000")
+        yield
+
+def _write_cr_files(repo_path):
+    """Create the CR directory and counter the CR commands expect."""
+    cr_dir = repo_path / ".gitstage" / "change_requests"
+    cr_dir.mkdir(parents=True)
+    next_cr_file = repo_path / ".gitstage" / "next_cr.txt"
+    next_cr_file.write_text("0001")
+
+@pytest.fixture(scope="session")
+def _template_root(tmp_path_factory):
+    """Directory for the session templates: tmpfs where available, since they are only read from."""
+    if not os.path.isdir("/dev/shm"):
+        yield tmp_path_factory.mktemp("templates")
+        return
+    root = Path(tempfile.mkdtemp(prefix="gitstage_templates", dir="/dev/shm"))
+    yield root
+    shutil.rmtree(root, ignore_errors=True)
+
+@pytest.fixture(scope="session")
+def _git_template_repo(_template_root, _git_env):
+    """Build a repository with one commit on main once per session; tests get copies of it."""
+    repo_path = _template_root / "git_repo"
+    repo_path.mkdir()
+    run_git(repo_path, "init", "-q")
+
+    # Create initial commit
+    (repo_path / "README.md").write_text("# Test Repo")
+    run_git(repo_path, "add", "README.md")
+    run_git(repo_path, "commit", "-q", "-m", "Initial commit")
+
+    return repo_path
+
+@pytest.fixture(scope="session")
+def _cr_template_repo(_template_root, _git_template_repo):
+    """The git template plus the gitstage/cr-log branch, built once per session."""
+    repo_path = _template_root / "cr_repo"
+    shutil.copytree(_git_template_repo, repo_path, symlinks=False)
+
+    # Set up CR infrastructure
+    _write_cr_files(repo_path)
+
+    # Create and set up CR branch
+    run_git(repo_path, "checkout", "-q", "--orphan", "gitstage/cr-log")
+    run_git(repo_path, "add", ".gitstage/change_requests", ".gitstage/next_cr.txt")
+    run_git(repo_path, "commit", "-q", "-m", "Initialize GitStage CR log branch")
+
+    # Switch back to main branch, which ignores .gitstage/* as `gitstage init` leaves it
+    run_git(repo_path, "checkout", "-q", "main")
+    (repo_path / ".gitignore").write_text("# GitStage\n.gitstage/*\n!.gitstage_config.json\n")
+    run_git(repo_path, "add", ".gitignore")
+    run_git(repo_path, "commit", "-q", "-m", "chore: add GitStage rules to .gitignore")
+
+    return repo_path
+
+@pytest.fixture(scope="session")
+def _push_template_repo(_template_root, _git_template_repo):
+    """The git template with dev/testing/main published to a bare origin and one
+    change on dev ready to promote. Returns (repo_path, origin_path)."""
+    origin_path = _template_root / "push_origin.git"
+    run_git(_template_root, "init", "-q", "--bare", str(origin_path))
+
+    repo_path = _template_root / "push_repo"
+    shutil.copytree(_git_template_repo, repo_path, symlinks=False)
+    run_git(repo_path, "remote", "add", "origin", str(origin_path))
+    run_git(repo_path, "branch", "dev")
+    run_git(repo_path, "branch", "testing")
+
+    run_git(repo_path, "checkout", "-q", "dev")
+    (repo_path / "feature.txt").write_text("feature\n")
+    run_git(repo_path, "add", "feature.txt")
+    run_git(repo_path, "commit", "-q", "-m", "Add feature")
+    run_git(repo_path, "push", "-q", "origin", "main", "dev", "testing")
+
+    return repo_path, origin_path
+
+@pytest.fixture(scope="session")
+def runner():
+    """One CliRunner shared by every CLI test."""
+    return CliRunner()
+
+@pytest.fixture
+def temp_cr_dir(tmp_path, monkeypatch):
+    """CR directory and counter only, with no Git repository, as the working directory."""
+    _write_cr_files(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def temp_git_repo(tmp_path, monkeypatch, _git_template_repo):
+    """Copy the template Git repository for testing and change into it."""
+    repo_path = tmp_path / "test_repo"
+    shutil.copytree(_git_template_repo, repo_path, symlinks=False)
+    monkeypatch.chdir(repo_path)
+    return repo_path
+
+@pytest.fixture
+def temp_git_repo_with_cr_branch(tmp_path, monkeypatch, _cr_template_repo):
+    """Like temp_git_repo, with the gitstage/cr-log branch already set up."""
+    repo_path = tmp_path / "test_repo"
+    shutil.copytree(_cr_template_repo, repo_path, symlinks=False)
+    monkeypatch.chdir(repo_path)
+    return repo_path
+
+@pytest.fixture
+def temp_push_repo(tmp_path, monkeypatch, _push_template_repo):
+    """Copy the push template and its origin, and change into the copy (on dev).
+    Returns (repo_path, origin_path)."""
+    template_repo, template_origin = _push_template_repo
+    origin_path = tmp_path / "origin.git"
+    repo_path = tmp_path / "test_repo"
+    shutil.copytree(template_origin, origin_path, symlinks=False)
+    shutil.copytree(template_repo, repo_path, symlinks=False)
+    run_git(repo_path, "remote", "set-url", "origin", str(origin_path))
+    monkeypatch.chdir(repo_path)
+    return repo_path, origin_path
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """A fresh change database under tmp_path, with the module-level engine and caches reset."""
+    from gitstage.commands import utils
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(utils, "_ENGINE", None)
+    monkeypatch.setattr(utils, "_SESSION", None)
+    monkeypatch.setattr(utils, "_pending_cache", (-1, []))
+    return tmp_path / ".gitstage" / "changes.db"
+
+@pytest.fixture
+def git():
+    """Run git directly in a test repository, to set up or inspect its history."""
+    return run_git
+
+@pytest.fixture
+def cr_data_factory():
+    """Build create_cr_file keyword arguments, overriding only what a test cares about."""
+    def make(**overrides):
+        data = {
+            "cr_number": "0001",
+            "summary": "Test",
+            "motivation": "Test",
+            "dependencies": "Test",
+            "acceptance": "Test",
+            "notes": None,
+        }
+        data.update(overrides)
+        return data
+    return make
+
+FROZEN_NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+@pytest.fixture
+def frozen_today(monkeypatch):
+    """Pin the clock used by the CR helpers; returns the date they will stamp."""
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return FROZEN_NOW.replace(tzinfo=tz) if tz else FROZEN_NOW
+
+    monkeypatch.setattr("gitstage.commands.cr.utils.datetime", FrozenDatetime)
+    return FROZEN_NOW.strftime("%Y-%m-%d")
@@ -1,9 +1,6 @@
-from typer.testing import CliRunner
 from gitstage.cli import app
 
-runner = CliRunner()
-
-def test_help():
+def test_help(runner):
     result = runner.invoke(app, ["--help"])
     assert result.exit_code == 0
     assert "Usage" in result.output
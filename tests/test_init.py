@@ -0,0 +1,103 @@
+import pytest
+import typer
+from git import Repo
+
+from gitstage.cli import app
+from gitstage.commands.init import commit_file_to_branch, setup_cr_infrastructure, validate_stage_name
+
+@pytest.mark.parametrize("stage", ["dev", "testing", "release/1.2", "qa_eu-west"])
+def test_validate_stage_name_accepts(stage):
+    validate_stage_name(stage)
+
+@pytest.mark.parametrize("stage", ["", "   ", "-dev", "my stage", "dev~1", "dev:main"])
+def test_validate_stage_name_rejects(stage):
+    with pytest.raises(typer.BadParameter):
+        validate_stage_name(stage)
+
+def test_commit_file_to_branch_adds_new_file(temp_git_repo, git):
+    git(temp_git_repo, "branch", "other")
+    base = git(temp_git_repo, "rev-parse", "other")
+
+    assert commit_file_to_branch(Repo(temp_git_repo), "other", "new.txt", "hello\n", "Add new.txt")
+
+    assert git(temp_git_repo, "show", "other:new.txt") == "hello"
+    assert git(temp_git_repo, "rev-parse", "other^") == base
+    assert git(temp_git_repo, "ls-tree", "--name-only", "other").splitlines() == ["README.md", "new.txt"]
+    # The checked-out branch and worktree are untouched
+    assert git(temp_git_repo, "rev-parse", "main") == base
+    assert not (temp_git_repo / "new.txt").exists()
+
+def test_commit_file_to_branch_skips_unchanged_content(temp_git_repo, git):
+    git(temp_git_repo, "branch", "other")
+    base = git(temp_git_repo, "rev-parse", "other")
+
+    assert not commit_file_to_branch(Repo(temp_git_repo), "other", "README.md", "# Test Repo", "No-op")
+    assert git(temp_git_repo, "rev-parse", "other") == base
+
+def test_commit_file_to_branch_replaces_existing_entry(temp_git_repo, git):
+    git(temp_git_repo, "branch", "other")
+
+    assert commit_file_to_branch(Repo(temp_git_repo), "other", "README.md", "# Changed\n", "Update README")
+
+    assert git(temp_git_repo, "show", "other:README.md") == "# Changed"
+    assert git(temp_git_repo, "ls-tree", "--name-only", "other").splitlines() == ["README.md"]
+
+def test_commit_file_to_branch_refreshes_checked_out_file(temp_git_repo, git):
+    assert commit_file_to_branch(Repo(temp_git_repo), "main", "README.md", "# Changed\n", "Update README")
+
+    assert (temp_git_repo / "README.md").read_text() == "# Changed\n"
+    assert git(temp_git_repo, "status", "--porcelain") == ""
+
+def test_commit_file_to_branch_keeps_local_edits(temp_git_repo, git):
+    (temp_git_repo / "README.md").write_text("# Local edit\n")
+
+    assert commit_file_to_branch(Repo(temp_git_repo), "main", "README.md", "# Changed\n", "Update README")
+
+    assert git(temp_git_repo, "show", "main:README.md") == "# Changed"
+    assert (temp_git_repo / "README.md").read_text() == "# Local edit\n"
+
+def test_init_leaves_worktree_clean(temp_git_repo, runner, git):
+    result = runner.invoke(app, ["init", "--stages", "dev", "--stages", "testing", "--stages", "main"])
+    assert result.exit_code == 0, result.output
+
+    assert git(temp_git_repo, "status", "--porcelain") == ""
+    assert "local changes" not in result.output
+    for stage in ("dev", "testing", "main"):
+        assert "dev" in git(temp_git_repo, "show", f"{stage}:.gitstage_config.json")
+
+def test_setup_cr_infrastructure_creates_branch(temp_git_repo, git):
+    heads = {"main"}
+
+    assert setup_cr_infrastructure(Repo(temp_git_repo), heads)
+
+    assert "gitstage/cr-log" in heads
+    assert git(temp_git_repo, "ls-tree", "-r", "--name-only", "gitstage/cr-log").splitlines() == [
+        ".gitstage/change_requests/.gitkeep",
+        ".gitstage/next_cr.txt",
+    ]
+    assert git(temp_git_repo, "show", "gitstage/cr-log:.gitstage/next_cr.txt") == "0001"
+    # A fresh branch is a parentless commit
+    assert git(temp_git_repo, "rev-list", "--count", "gitstage/cr-log") == "1"
+
+    # A second run finds everything in place
+    assert not setup_cr_infrastructure(Repo(temp_git_repo), heads)
+
+def test_setup_cr_infrastructure_fills_in_existing_branch(temp_git_repo, git):
+    git(temp_git_repo, "checkout", "-q", "-b", "gitstage/cr-log")
+    (temp_git_repo / ".gitstage").mkdir()
+    (temp_git_repo / ".gitstage" / "next_cr.txt").write_text("0005")
+    git(temp_git_repo, "add", ".gitstage/next_cr.txt")
+    git(temp_git_repo, "commit", "-q", "-m", "Existing CR log")
+    git(temp_git_repo, "checkout", "-q", "main")
+    base = git(temp_git_repo, "rev-parse", "gitstage/cr-log")
+
+    assert setup_cr_infrastructure(Repo(temp_git_repo), {"main", "gitstage/cr-log"})
+
+    assert git(temp_git_repo, "rev-parse", "gitstage/cr-log^") == base
+    assert git(temp_git_repo, "ls-tree", "-r", "--name-only", "gitstage/cr-log").splitlines() == [
+        ".gitstage/change_requests/.gitkeep",
+        ".gitstage/next_cr.txt",
+        "README.md",
+    ]
+    # The existing counter is kept
+    assert git(temp_git_repo, "show", "gitstage/cr-log:.gitstage/next_cr.txt") == "0005"
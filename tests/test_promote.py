@@ -0,0 +1,32 @@
+from gitstage.cli import app
+from gitstage.commands.utils import record_change
+
+def test_promote_fast_forwards_target(temp_push_repo, temp_db, runner, git):
+    repo_path, origin_path = temp_push_repo
+    head = git(repo_path, "rev-parse", "dev")
+    record_change(head, "Add feature", "Ran it")
+
+    result = runner.invoke(app, ["promote", "promote", "--target", "testing"], input="y\n")
+    assert result.exit_code == 0, result.output
+
+    assert git(repo_path, "rev-parse", "testing") == head
+    assert git(origin_path, "rev-parse", "testing") == head
+    assert git(repo_path, "branch", "--show-current") == "dev"
+
+def test_promote_refuses_to_drop_target_commits(temp_push_repo, temp_db, runner, git):
+    repo_path, origin_path = temp_push_repo
+    head = git(repo_path, "rev-parse", "dev")
+    record_change(head, "Add feature", "Ran it")
+    # A commit on local testing that dev does not have
+    git(repo_path, "checkout", "-q", "testing")
+    git(repo_path, "commit", "-q", "--allow-empty", "-m", "Hotfix")
+    hotfix = git(repo_path, "rev-parse", "testing")
+    git(repo_path, "checkout", "-q", "dev")
+    published = git(origin_path, "rev-parse", "testing")
+
+    result = runner.invoke(app, ["promote", "promote", "--target", "testing"], input="y\n")
+    assert result.exit_code == 1
+
+    assert "refusing to move it" in result.output
+    assert git(repo_path, "rev-parse", "testing") == hotfix
+    assert git(origin_path, "rev-parse", "testing") == published
@@ -1,18 +1,145 @@
-import tempfile
-from pathlib import Path
+import subprocess
+
 from git import Repo
-from typer.testing import CliRunner
+
 from gitstage.cli import app
+from gitstage.commands.push import _selected_from_template, _status, compute_branch_state, is_sync_cached, record_synced
+
+def test_push_command(temp_push_repo, runner, git):
+    repo_path, origin_path = temp_push_repo
+    
+    # Summary, test plan, all files, confirm
+    result = runner.invoke(app, ["push"], input="Test summary\nTest plan\na\ny\n")
+    assert result.exit_code == 0, result.output
+    
+    # feature.txt was promoted from dev to testing and pushed
+    assert "feature.txt" in git(origin_path, "ls-tree", "--name-only", "testing").splitlines()
+    assert git(repo_path, "branch", "--show-current") == "dev"
+
+def test_push_all_commits_uncommitted_changes(temp_push_repo, runner, git):
+    repo_path, origin_path = temp_push_repo
+    (repo_path / "feature.txt").write_text("feature, edited\n")
+    
+    result = runner.invoke(app, [
+        "push", "--all", "--files", "feature.txt",
+        "--summary", "Edit feature", "--test-plan", "Ran it",
+    ])
+    assert result.exit_code == 0, result.output
+    
+    # The edit was committed on dev first and is what reached testing
+    assert git(repo_path, "status", "--porcelain") == ""
+    assert git(origin_path, "show", "testing:feature.txt") == "feature, edited"
+
+def test_push_all_still_confirms_pushing_the_source_branch(temp_push_repo, runner, git):
+    repo_path, origin_path = temp_push_repo
+    (repo_path / "more.txt").write_text("more\n")
+    git(repo_path, "add", "more.txt")
+    git(repo_path, "commit", "-q", "-m", "Add more")
+    
+    # Without summary and test plan on the command line, --all still asks before pushing dev
+    result = runner.invoke(app, ["push", "--all"], input="n\n")
+    assert result.exit_code == 1
+    assert "Push dev to origin?" in result.output
+    assert "more.txt" not in git(origin_path, "ls-tree", "--name-only", "dev").splitlines()
+
+def test_status_classifies_porcelain_records(temp_git_repo, git):
+    # An unmerged path: both sides change "con flict.txt"
+    (temp_git_repo / "con flict.txt").write_text("base\n")
+    git(temp_git_repo, "add", "con flict.txt")
+    git(temp_git_repo, "commit", "-q", "-m", "Add con flict.txt")
+    git(temp_git_repo, "checkout", "-q", "-b", "side")
+    (temp_git_repo / "con flict.txt").write_text("side\n")
+    git(temp_git_repo, "commit", "-q", "-am", "Side change")
+    git(temp_git_repo, "checkout", "-q", "main")
+    (temp_git_repo / "con flict.txt").write_text("main\n")
+    git(temp_git_repo, "commit", "-q", "-am", "Main change")
+    subprocess.run(["git", "merge", "-q", "side"], cwd=temp_git_repo, capture_output=True)
+    
+    # A staged rename, and an untracked file
+    git(temp_git_repo, "mv", "README.md", "read me.md")
+    (temp_git_repo / "new file.txt").write_text("new\n")
+    
+    modified, untracked = _status(Repo(temp_git_repo))
+    
+    assert sorted(modified) == ["con flict.txt", "read me.md"]
+    assert untracked == ["new file.txt"]
+
+def test_flush_push_clears_queue_after_push(temp_push_repo, runner, git, tmp_path, monkeypatch):
+    repo_path, origin_path = temp_push_repo
+    queue = tmp_path / "pending_push.jsonl"
+    monkeypatch.setattr("gitstage.commands.push.PENDING_PUSH_FILE", queue)
+    
+    result = runner.invoke(app, [
+        "push", "--all", "--defer", "--files", "feature.txt",
+        "--summary", "Add feature", "--test-plan", "Ran it",
+    ])
+    assert result.exit_code == 0, result.output
+    assert len(queue.read_text().splitlines()) == 1
+    assert "feature.txt" not in git(origin_path, "ls-tree", "--name-only", "testing").splitlines()
+    
+    # A failed push keeps the queue
+    git(repo_path, "remote", "set-url", "origin", str(tmp_path / "missing.git"))
+    result = runner.invoke(app, ["flush-push"])
+    assert result.exit_code == 1
+    assert len(queue.read_text().splitlines()) == 1
+    
+    git(repo_path, "remote", "set-url", "origin", str(origin_path))
+    result = runner.invoke(app, ["flush-push"])
+    assert result.exit_code == 0, result.output
+    assert not queue.exists()
+    assert "feature.txt" in git(origin_path, "ls-tree", "--name-only", "testing").splitlines()
+
+def test_sync_cache_tracks_branch_commits(temp_push_repo, git):
+    repo_path, _ = temp_push_repo
+    repo = Repo(repo_path)
+    assert not is_sync_cached(repo, "dev")
+    
+    record_synced(repo, "dev")
+    
+    assert (repo_path / ".git" / "gitstage_sync_cache.json").exists()
+    assert git(repo_path, "status", "--porcelain") == ""
+    assert is_sync_cached(repo, "dev")
+    
+    # Moving the local branch invalidates the entry
+    git(repo_path, "commit", "-q", "--allow-empty", "-m", "Unpushed")
+    assert not is_sync_cached(repo, "dev")
+
+def test_compute_branch_state(temp_push_repo, git):
+    repo_path, _ = temp_push_repo
+    repo = Repo(repo_path)
+    
+    state = compute_branch_state(repo, "dev", "testing")
+    assert state == (("feature.txt",), True, False)
+    
+    # Promote dev's content to testing the way push does
+    dev_sha = git(repo_path, "rev-parse", "dev")
+    git(repo_path, "checkout", "-q", "testing")
+    git(repo_path, "checkout", "dev", "--", "feature.txt")
+    git(repo_path, "commit", "-q", "-m", f"Add feature\n\nPromoted from dev commit: {dev_sha}")
+    
+    state = compute_branch_state(repo, "dev", "testing")
+    assert state == ((), True, True)
+    
+    assert compute_branch_state(repo, "testing", "testing") == ((), False, False)
+
+def test_compute_branch_state_lists_renamed_paths_from_source(temp_git_repo, git):
+    git(temp_git_repo, "checkout", "-q", "-b", "other")
+    git(temp_git_repo, "mv", "README.md", "GUIDE.md")
+    git(temp_git_repo, "commit", "-q", "-m", "Rename README")
+    
+    assert compute_branch_state(Repo(temp_git_repo), "other", "main").files == ("GUIDE.md",)
 
-runner = CliRunner()
-
-def test_push_command():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        repo_path = Path(tmpdir)
-        repo = Repo.init(repo_path)
-        (repo_path / "README.md").write_text("Initial commit")
-        repo.index.add(["README.md"])
-        repo.index.commit("init")
-        
-        result = runner.invoke(app, ["push"], input="Test summary\nTest plan\n")
-        assert result.exit_code == 0
+def test_selected_from_template_matches_exact_lines(capsys):
+    files = ["#notes.md", " padded.txt", "keep.py", "drop.py"]
+    edited = (
+        "# Delete or comment out the files you do not want to include.\n"
+        "# Other lines starting with '#' are ignored.\n"
+        "#notes.md\n"
+        " padded.txt\n"
+        "keep.py\n"
+        "#drop.py\n"
+        "typo.py\n"
+    )
+    
+    assert _selected_from_template(edited, files) == ["#notes.md", " padded.txt", "keep.py"]
+    assert "typo.py" in capsys.readouterr().out
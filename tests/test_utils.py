@@ -0,0 +1,68 @@
+from sqlalchemy import text
+
+from gitstage.commands.utils import (
+    ChangeStatus, get_change, get_db_session, get_pending_changes, record_change,
+    record_changes, save_stageflow, session_scope, stageflow_json, update_all_pending_changes,
+    update_change_status,
+)
+
+def test_db_engine_is_created_once(temp_db):
+    first, second = get_db_session(), get_db_session()
+    try:
+        assert first.get_bind() is second.get_bind()
+        assert temp_db.exists()
+        assert first.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        indexes = first.execute(text("PRAGMA index_list('changes')")).all()
+        assert "ix_changes_status_created" in {row[1] for row in indexes}
+    finally:
+        first.close()
+        second.close()
+
+def test_update_all_pending_changes(temp_db):
+    record_changes([
+        {"commit_hash": "a" * 40, "summary": "A", "test_plan": "T"},
+        {"commit_hash": "b" * 40, "summary": "B", "test_plan": "T"},
+    ])
+    update_change_status("b" * 40, ChangeStatus.REJECTED)
+
+    assert update_all_pending_changes(ChangeStatus.APPROVED) == 1
+    assert get_change("a" * 40).status == ChangeStatus.APPROVED
+    assert get_change("b" * 40).status == ChangeStatus.REJECTED
+    assert get_pending_changes() == []
+
+def test_update_change_status(temp_db):
+    record_change("a" * 40, "A", "T")
+
+    change = update_change_status("a" * 40, ChangeStatus.APPROVED)
+
+    assert change.commit_hash == "a" * 40
+    assert change.status == ChangeStatus.APPROVED
+    assert get_change("a" * 40).status == ChangeStatus.APPROVED
+    assert update_change_status("f" * 40, ChangeStatus.APPROVED) is None
+    assert get_change("f" * 40) is None
+
+def test_pending_cache_sees_change_recorded_in_callers_session(temp_db):
+    record_change("a" * 40, "A", "T")
+
+    with session_scope() as session:
+        record_change("b" * 40, "B", "T", session=session)
+        # Not committed yet, so the cached list is still current
+        assert [c.commit_hash for c in get_pending_changes()] == ["a" * 40]
+
+    assert [c.commit_hash for c in get_pending_changes()] == ["a" * 40, "b" * 40]
+
+def test_save_stageflow_skips_unchanged_content(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = tmp_path / ".gitstage_config.json"
+    save_stageflow(["dev", "main"])
+    assert config.read_text() == stageflow_json(["dev", "main"])
+
+    def fail_open(*args, **kwargs):
+        raise AssertionError("unchanged config was rewritten")
+
+    with monkeypatch.context() as m:
+        m.setattr("gitstage.commands.utils.os.open", fail_open)
+        save_stageflow(["dev", "main"])
+
+    save_stageflow(["dev", "testing", "main"], durable=True)
+    assert config.read_text() == stageflow_json(["dev", "testing", "main"])